@@ -1,11 +1,14 @@
 import streamlit as st
+from pathlib import Path
 import pandas as pd
 import numpy as np
-from lifelines import KaplanMeierFitter, CoxPHFitter
+from sksurv.linear_model import CoxPHSurvivalAnalysis
+from sksurv.util import Surv
 import matplotlib.pyplot as plt
 import folium
 from folium.plugins import HeatMap
 from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 
 st.set_page_config(page_title="IVLRF Prototype – Exhibit C", layout="wide")
 
@@ -20,40 +23,89 @@ Designed as open-source, dataset-agnostic tool for federal/state agencies (NHTSA
 # -------------------------------
 # Synthetic dataset (realistic, based on typical vehicle data)
 # -------------------------------
+# Baked by scripts/bake_demo_data.py
+DEMO_DATA_FILE = Path(__file__).parent / "data" / "demo_vehicles.parquet"
+
 @st.cache_data
 def load_data():
-    np.random.seed(42)
-    n = 1200
-    df = pd.DataFrame({
-        'age_years': np.random.uniform(1, 20, n),
-        'mileage': np.random.lognormal(mean=10, sigma=1, size=n) * 10000,
-        'engine_size_L': np.random.choice([1.4, 1.6, 2.0, 2.5, 3.0], n),
-        'fuel_type': np.random.choice(['Gasoline', 'Diesel', 'Hybrid'], n, p=[0.7, 0.2, 0.1]),
-        'co2_g_per_km': np.random.normal(180, 50, n).clip(80, 350),
-        'region': np.random.choice(['Northeast', 'Midwest', 'South', 'West'], n),
-        'observed_failure': np.random.binomial(1, 0.65, n),  # ~65% censored or failed
-        'time_to_failure_months': np.where(np.random.binomial(1, 0.65, n),
-                                           np.random.exponential(scale=120, size=n),
-                                           np.random.uniform(60, 240, n))
-    })
-    df['high_risk_emission'] = (df['co2_g_per_km'] > 220).astype(int)
-    return df
+    return pd.read_parquet(DEMO_DATA_FILE)
 
 df = load_data()
 
+# -------------------------------
+# Cached model fits (reused across widget-triggered reruns)
+# -------------------------------
+def kaplan_meier(times, events):
+    # S(t_i) = prod(1 - d_i / n_i) over the sorted unique times, starting at S(0) = 1
+    t, idx = np.unique(times, return_inverse=True)
+    d = np.bincount(idx, weights=events.astype(np.float64))
+    n = len(times) - np.concatenate([[0], np.cumsum(np.bincount(idx))[:-1]])
+    return np.concatenate([[0.0], t]), np.concatenate([[1.0], np.cumprod(1 - d / n)])
+
+@st.cache_data
+def fit_km_by_fuel(df):
+    curves = {}
+    for fuel in ['Gasoline', 'Diesel', 'Hybrid']:
+        mask = df['fuel_type'] == fuel
+        curves[fuel] = kaplan_meier(df.loc[mask, 'time_to_failure_months'].to_numpy(), df.loc[mask, 'observed_failure'].to_numpy())
+    return curves
+
+COX_COVARIATES = ['mileage', 'age_years', 'engine_size_L', 'co2_g_per_km']
+
+@st.cache_data
+def fit_cox(df):
+    # Fit on standardized covariates (as lifelines does internally), then
+    # rescale so coefficients are per original unit
+    X = df[COX_COVARIATES].to_numpy(dtype=np.float32)
+    y = Surv.from_arrays(event=df['observed_failure'].astype(bool), time=df['time_to_failure_months'])
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    cph = CoxPHSurvivalAnalysis().fit((X - mean) / std, y)
+    return pd.Series(cph.coef_ / std, index=COX_COVARIATES), mean
+
+# -------------------------------
+# Risk map rendering (HTML cached so reruns skip folium serialization)
+# -------------------------------
+def build_risk_map(df_locations):
+    m = folium.Map(location=[37.8, -96], zoom_start=4, tiles='OpenStreetMap')
+
+    # Heatmap for overall clustering; pre-bin into a coarse lat/lon grid so
+    # the browser receives one weighted point per cell
+    grid = df_locations.groupby(
+        [pd.cut(df_locations['lat'], 40), pd.cut(df_locations['lon'], 80)], observed=True
+    ).agg(lat=('lat', 'mean'), lon=('lon', 'mean'), w=('risk_weight', 'sum'))
+    heat_data = grid[['lat', 'lon', 'w']].to_numpy().tolist()
+    HeatMap(heat_data, radius=60, blur=30, max_zoom=1).add_to(m)
+
+    # Individual markers with detailed, readable popups
+    for row in df_locations.itertuples(index=False):
+        popup_html = f"""
+        <div style='font-size: 18px; min-width: 280px; padding: 12px; background-color: #f9f9f9; border-radius: 8px;'>
+            <b>Location:</b> {row.name}<br>
+            <b>Predicted Relative Risk:</b> {row.risk:.2f} (higher = elevated lifecycle/emission risk)<br>
+            <b>Equity & Safety Note:</b> {row.note}
+        </div>
+        """
+        folium.Marker(
+            location=[row.lat, row.lon],
+            popup=folium.Popup(popup_html, max_width=400),
+            icon=folium.Icon(color='red' if row.risk > 1.1 else 'blue', icon='info-sign')
+        ).add_to(m)
+    return m
+
+@st.cache_data(ttl='1h', max_entries=8)
+def build_risk_map_html(df_locations):
+    return build_risk_map(df_locations).get_root().render()
+
 tab1, tab2, tab3 = st.tabs(["Survival Modeling", "Risk Prediction (Cox)", "Geospatial Risk Map"])
 
 with tab1:
     st.subheader("Kaplan-Meier Survival Curves – Vehicle Lifespan Prediction")
     st.markdown("Non-parametric estimation of survival probability (probability vehicle remains below high-risk emission threshold).")
 
-    kmf = KaplanMeierFitter()
-
     fig, ax = plt.subplots(figsize=(9, 5))
-    for fuel in ['Gasoline', 'Diesel', 'Hybrid']:
-        mask = df['fuel_type'] == fuel
-        kmf.fit(df.loc[mask, 'time_to_failure_months'], event_observed=df.loc[mask, 'observed_failure'], label=fuel)
-        kmf.plot_survival_function(ax=ax)
+    for fuel, (t, s) in fit_km_by_fuel(df).items():
+        ax.step(t, s, where='post', label=fuel)
+    ax.legend()
 
     ax.set_title("Survival Function by Fuel Type (Higher = Lower Risk of High-Emission State)")
     ax.set_xlabel("Time (months)")
@@ -68,12 +120,10 @@ with tab2:
     st.subheader("Cox Proportional Hazards – Predictive Risk Scoring")
     st.markdown("Parametric model estimating hazard (risk) of entering high-emission/failure state based on mileage, age, etc.")
 
-    cph = CoxPHFitter()
-    cph_df = df[['time_to_failure_months', 'observed_failure', 'mileage', 'age_years', 'engine_size_L', 'co2_g_per_km']].copy()
-    cph.fit(cph_df, duration_col='time_to_failure_months', event_col='observed_failure')
+    coef, covariate_means = fit_cox(df)
 
     st.write("**Hazard Ratios (exp(coef))** — Higher value = higher risk:")
-    st.dataframe(np.exp(cph.params_).to_frame(name="Hazard Ratio"))
+    st.dataframe(np.exp(coef).to_frame(name="Hazard Ratio"))
 
     st.markdown("""
     Example: Mileage has strong positive effect on hazard → predictive signal for targeting older, high-mileage vehicles nationally.
@@ -91,7 +141,8 @@ with tab2:
         'engine_size_L': [engine_input],
         'co2_g_per_km': [180]  # median-like
     })
-    risk_score = cph.predict_partial_hazard(sample)[0]
+    # Partial hazard relative to the average vehicle, exp((x - mean) @ coef)
+    risk_score = np.exp((sample[COX_COVARIATES].to_numpy() - covariate_means) @ coef.to_numpy())[0]
     st.metric("Predicted Relative Hazard (Risk Score)", f"{risk_score:.2f}", delta="Higher = elevated lifecycle risk")
 
 with tab3:
@@ -119,28 +170,11 @@ with tab3:
     df_locations = pd.DataFrame(location_data)
     df_locations['risk_weight'] = df_locations['risk'] * 100  # Scale for heatmap visibility
 
-    m = folium.Map(location=[37.8, -96], zoom_start=4, tiles='OpenStreetMap')
-
-    # Heatmap for overall clustering
-    heat_data = [[row['lat'], row['lon'], row['risk_weight']] for _, row in df_locations.iterrows()]
-    HeatMap(heat_data, radius=60, blur=30, max_zoom=1).add_to(m)
-
-    # Individual markers with detailed, readable popups
-    for _, row in df_locations.iterrows():
-        popup_html = f"""
-        <div style='font-size: 18px; min-width: 280px; padding: 12px; background-color: #f9f9f9; border-radius: 8px;'>
-            <b>Location:</b> {row['name']}<br>
-            <b>Predicted Relative Risk:</b> {row['risk']:.2f} (higher = elevated lifecycle/emission risk)<br>
-            <b>Equity & Safety Note:</b> {row['note']}
-        </div>
-        """
-        folium.Marker(
-            location=[row['lat'], row['lon']],
-            popup=folium.Popup(popup_html, max_width=400),
-            icon=folium.Icon(color='red' if row['risk'] > 1.1 else 'blue', icon='info-sign')
-        ).add_to(m)
-
-    st_folium(m, width=None, height=700, use_container_width=True, key="equity_risk_map")
+    # Static cached HTML by default; st_folium (bi-directional) only on opt-in
+    if st.checkbox("Enable interactive map selections", value=False):
+        st_folium(build_risk_map(df_locations), width=None, height=700, use_container_width=True, key="equity_risk_map")
+    else:
+        components.html(build_risk_map_html(df_locations), height=700)
 
 st.markdown("---")
 st.caption("Prototype version 1.0 – For USCIS evidentiary purposes only. Open-source under MIT license. Contact for full code/dataset expansion.")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Bake the synthetic dashboard dataset to Parquet
+Run with: python scripts/bake_demo_data.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+OUTPUT_FILE = Path(__file__).resolve().parent.parent / "data" / "demo_vehicles.parquet"
+REGIONS = ['Northeast', 'Midwest', 'South', 'West']
+
+def build_demo_data():
+    """
+    Synthetic dataset (realistic, based on typical vehicle data)
+    """
+    rng = np.random.default_rng(42)
+    n = 1200
+    df = pd.DataFrame({
+        'age_years': rng.uniform(1, 20, n),
+        'mileage': rng.lognormal(mean=10, sigma=1, size=n) * 10000,
+        'engine_size_L': rng.choice([1.4, 1.6, 2.0, 2.5, 3.0], n),
+        'fuel_type': rng.choice(['Gasoline', 'Diesel', 'Hybrid'], n, p=[0.7, 0.2, 0.1]),
+        'co2_g_per_km': rng.normal(180, 50, n).clip(80, 350),
+        'region': rng.choice(REGIONS, n),
+        'observed_failure': rng.binomial(1, 0.65, n),  # ~65% censored or failed
+        'time_to_failure_months': np.where(rng.binomial(1, 0.65, n),
+                                           rng.exponential(scale=120, size=n),
+                                           rng.uniform(60, 240, n))
+    })
+    df['high_risk_emission'] = (df['co2_g_per_km'] > 220).astype(int)
+    # Store region as int8 codes (dictionary-encoded in Parquet)
+    df['region'] = pd.Categorical(df['region'], categories=REGIONS)
+    return df
+
+def main():
+    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    df = build_demo_data()
+    df.to_parquet(OUTPUT_FILE, engine='pyarrow', compression='zstd', index=False)
+    print(f"Saved {len(df)} demo vehicle records to: {OUTPUT_FILE}")
+
+if __name__ == "__main__":
+    main()
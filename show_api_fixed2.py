@@ -4,11 +4,16 @@ IVLRF API INTEGRATION DEMONSTRATION
 Shows real connections to U.S. government data sources
 """
 
+import os
 import requests
 import time
 import pandas as pd
 from datetime import datetime
 
+# Cosmetic pacing multiplier for the sleeps below; 0 (default) for headless
+# runs, export IVLRF_PACE=1 for live presentations
+PACE = float(os.environ.get('IVLRF_PACE', '0'))
+
 def demonstrate_us_government_apis():
     """Show live API connections to U.S. government data sources"""
     
@@ -30,7 +35,7 @@ def demonstrate_us_government_apis():
         # Example NHTSA API call
         nhtsa_url = "https://vpic.nhtsa.dot.gov/api/vehicles/DecodeVin/5UXKR6C58F0R12345?format=json"
         print(f"   Testing connection to NHTSA API...")
-        time.sleep(1)
+        time.sleep(1 * PACE)
         # response = requests.get(nhtsa_url, timeout=5)
         # if response.status_code == 200:
         print("   NHTSA API: Connection successful")
@@ -48,7 +53,7 @@ def demonstrate_us_government_apis():
     
     try:
         print("   Testing connection to EPA API...")
-        time.sleep(1)
+        time.sleep(1 * PACE)
         # Example EPA API endpoints
         print("   EPA API: Connection successful")
         print("    Accesses MOVES model for emissions calculation")
@@ -65,7 +70,7 @@ def demonstrate_us_government_apis():
     
     try:
         print("   Testing connection to FHWA data sources...")
-        time.sleep(1)
+        time.sleep(1 * PACE)
         print("   FHWA Data: Connection successful")
         print("    Accesses $30B+ annual safety spending data")
         print("    Retrieves crash corridor and hotspot analysis")
@@ -81,7 +86,7 @@ def demonstrate_us_government_apis():
     
     try:
         print("   Testing connection to Census API...")
-        time.sleep(1)
+        time.sleep(1 * PACE)
         print("   Census API: Connection successful")
         print("    Retrieves demographic data for equity analysis")
         print("    Accesses income distribution and poverty rates")
@@ -125,7 +130,7 @@ def demonstrate_phd_model_integration():
         print(f"      Citation: {citation}")
         print(f"      Purpose: {purpose}")
         print(f"      Status: Processing API data...")
-        time.sleep(0.5)
+        time.sleep(0.5 * PACE)
         print(f"      Applied to U.S. vehicle data")
     
     print("\n" + "-"*70)
@@ -164,7 +169,7 @@ def generate_agency_outputs():
         print(f"   Output File: {filename}")
         print(f"   Description: {description}")
         print(f"   Status: Generating from PhD model results...")
-        time.sleep(0.5)
+        time.sleep(0.5 * PACE)
         print(f"   Created successfully")
     
     print("\n" + "-"*70)
@@ -178,14 +183,14 @@ def generate_agency_outputs():
 
 if __name__ == "__main__":
     print("Starting IVLRF API Integration Demonstration...")
-    time.sleep(1)
+    time.sleep(1 * PACE)
     
     # Run all demonstrations
     demonstrate_us_government_apis()
-    time.sleep(2)
+    time.sleep(2 * PACE)
     
     demonstrate_phd_model_integration()
-    time.sleep(2)
+    time.sleep(2 * PACE)
     
     generate_agency_outputs()
     
@@ -3,51 +3,71 @@ Emissions Calculator for EPA Targeting
 """
 import pandas as pd
 import numpy as np
-import os
+from utils import NUMBA_MIN_ROWS, njit, output_path, prange
 
-def calculate_emissions(vehicle_df, survival_data=None):
+# EPA emission factors (grams/mile); rows follow _CATEGORIES, columns _POLLUTANTS
+_CATEGORIES = ('pre_2000', '2000_2009', '2010_2019', '2020_plus')
+_POLLUTANTS = ('CO2', 'NOx', 'PM25')
+_FACTORS = np.array([
+    [500, 1.2, 0.08],
+    [420, 0.8, 0.05],
+    [350, 0.4, 0.02],
+    [280, 0.2, 0.01]
+], dtype=np.float32)
+_YEAR_BINS = [-np.inf, 2000, 2010, 2020, np.inf]
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _emit_kernel(cat_codes, factors, mileage, per_mile, annual):
+        """
+        Gather per-mile factors by category code and scale to annual kg
+        """
+        for i in prange(cat_codes.shape[0]):
+            c = cat_codes[i]
+            for p in range(factors.shape[1]):
+                if c < 0:  # missing model year
+                    per_mile[i, p] = np.nan
+                    annual[i, p] = np.nan
+                else:
+                    per_mile[i, p] = factors[c, p]
+                    annual[i, p] = factors[c, p] * mileage / 1000
+else:
+    _emit_kernel = None
+
+def calculate_emissions(vehicle_df, survival_data=None, tag=None):
     """
     Calculate emissions using EPA MOVES methodology
+    
+    tag (e.g. 'CA_2023') is appended to output filenames.
     """
     print("Calculating vehicle emissions...")
     
-    # EPA emission factors (grams/mile)
-    emission_factors = {
-        'pre_2000': {'CO2': 500, 'NOx': 1.2, 'PM25': 0.08},
-        '2000_2009': {'CO2': 420, 'NOx': 0.8, 'PM25': 0.05},
-        '2010_2019': {'CO2': 350, 'NOx': 0.4, 'PM25': 0.02},
-        '2020_plus': {'CO2': 280, 'NOx': 0.2, 'PM25': 0.01}
-    }
+    # Assign emission category (vectorized binning on model year)
+    vehicle_df['emission_category'] = pd.cut(
+        vehicle_df['model_year'], bins=_YEAR_BINS, labels=list(_CATEGORIES),
+        right=False, ordered=True
+    )
+    codes = vehicle_df['emission_category'].cat.codes.to_numpy()
+    
+    # Annual mileage (int32 keeps the float32 emission columns from upcasting)
+    annual_mileage = np.int32(12000)
+    
+    # Calculate emissions: one gather from the factor table for all pollutants
+    if _emit_kernel is not None and len(vehicle_df) >= NUMBA_MIN_ROWS:
+        per_mile = np.empty((len(vehicle_df), len(_POLLUTANTS)), dtype=np.float32)
+        annual = np.empty_like(per_mile)
+        _emit_kernel(codes, _FACTORS, annual_mileage, per_mile, annual)
+    else:
+        per_mile = _FACTORS[codes]
+        per_mile[codes < 0] = np.nan  # missing model year
+        annual = per_mile * annual_mileage / 1000
     
-    # Assign emission category
-    def get_category(year):
-        if year < 2000:
-            return 'pre_2000'
-        elif year < 2010:
-            return '2000_2009'
-        elif year < 2020:
-            return '2010_2019'
-        else:
-            return '2020_plus'
-    
-    vehicle_df['emission_category'] = vehicle_df['model_year'].apply(get_category)
-    
-    # Calculate emissions
-    for pollutant in ['CO2', 'NOx', 'PM25']:
-        vehicle_df[f'{pollutant}_g_per_mile'] = vehicle_df['emission_category'].apply(
-            lambda x: emission_factors[x][pollutant]
-        )
-    
-    # Annual mileage
-    vehicle_df['annual_mileage'] = 12000
-    
-    # Annual emissions
-    vehicle_df['CO2_annual_kg'] = vehicle_df['CO2_g_per_mile'] * vehicle_df['annual_mileage'] / 1000
-    vehicle_df['NOx_annual_kg'] = vehicle_df['NOx_g_per_mile'] * vehicle_df['annual_mileage'] / 1000
-    vehicle_df['PM25_annual_kg'] = vehicle_df['PM25_g_per_mile'] * vehicle_df['annual_mileage'] / 1000
+    vehicle_df[[f'{p}_g_per_mile' for p in _POLLUTANTS]] = per_mile
+    vehicle_df['annual_mileage'] = annual_mileage
+    vehicle_df[[f'{p}_annual_kg' for p in _POLLUTANTS]] = annual
     
     # Generate EPA targeting list
-    epa_list = generate_epa_targeting_list(vehicle_df)
+    epa_list = generate_epa_targeting_list(vehicle_df, tag=tag)
     
     return {
         'emissions_data': vehicle_df,
@@ -55,24 +75,22 @@ def calculate_emissions(vehicle_df, survival_data=None):
         'summary': {
             'total_CO2_kg': vehicle_df['CO2_annual_kg'].sum(),
             'total_PM25_kg': vehicle_df['PM25_annual_kg'].sum(),
-            'high_emitters': len(vehicle_df[vehicle_df['emission_category'] == 'pre_2000'])
+            'high_emitters': int((codes == 0).sum())  # pre_2000
         }
     }
 
-def generate_epa_targeting_list(vehicle_df, top_n=50):
+def generate_epa_targeting_list(vehicle_df, top_n=50, tag=None):
     """
     Generate EPA targeting list for scrappage programs
     """
     print(f"Generating EPA targeting list (top {top_n} high-emitters)...")
     
-    # Create outputs folder if it doesn't exist
-    outputs_dir = '../outputs'
-    if not os.path.exists(outputs_dir):
-        os.makedirs(outputs_dir)
+    output_file = output_path('epa_target_list.parquet', tag)
     
     # Target oldest, highest-emitting vehicles
-    target_df = vehicle_df[vehicle_df['emission_category'].isin(['pre_2000', '2000_2009'])]
-    target_df = target_df.sort_values('PM25_annual_kg', ascending=False).head(top_n)
+    target_df = vehicle_df.loc[
+        vehicle_df['emission_category'].isin(['pre_2000', '2000_2009'])
+    ].nlargest(top_n, 'PM25_annual_kg')
     
     # Calculate benefits
     target_df['estimated_benefit'] = (
@@ -87,9 +105,9 @@ def generate_epa_targeting_list(vehicle_df, top_n=50):
         'estimated_benefit'
     ]].copy()
     
-    # Save
-    result.to_csv(os.path.join(outputs_dir, 'epa_target_list.csv'), index=False)
-    print(f"EPA target list saved to: {os.path.join(outputs_dir, 'epa_target_list.csv')}")
+    # Save as typed, columnar Parquet (emission_category stays dictionary-encoded)
+    result.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
+    print(f"EPA target list saved to: {output_file}")
     
     return result
 
@@ -100,14 +118,14 @@ def test_emissions_calculator():
     print("Testing Emissions Calculator...")
     
     # Test data
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n = 500
     
     test_data = pd.DataFrame({
         'vin': [f'VIN{i:08d}' for i in range(n)],
-        'make': np.random.choice(['Toyota', 'Ford', 'Honda'], n),
-        'model_year': np.random.randint(1990, 2023, n),
-        'vehicle_age': 2024 - np.random.randint(1990, 2023, n)
+        'make': rng.choice(['Toyota', 'Ford', 'Honda'], n),
+        'model_year': rng.integers(1990, 2023, n),
+        'vehicle_age': 2024 - rng.integers(1990, 2023, n)
     })
     
     results = calculate_emissions(test_data)
@@ -3,19 +3,24 @@ Equity Mapping for HUD Compliance
 """
 import pandas as pd
 import numpy as np
-import os
+from utils import output_path, write_csv, write_parquet
 
-def calculate_equity_disparities(vehicle_df, risk_data, demo_data=None):
+# Synthetic demographic data by ZIP (built once, indexed for the join)
+_ZIP_DEMO = pd.DataFrame({
+    'zip_code': [90001, 90011, 90210, 94102, 95123],
+    'median_income': [45000, 38000, 125000, 85000, 72000],
+    'poverty_rate': [0.22, 0.28, 0.05, 0.12, 0.15],
+    'minority_pct': [0.85, 0.92, 0.25, 0.45, 0.38]
+}).set_index('zip_code').astype({'median_income': 'int32', 'poverty_rate': 'float32', 'minority_pct': 'float32'})
+
+def calculate_equity_disparities(vehicle_df, risk_data, demo_data=None, tag=None):
     """
     Calculate equity disparities for HUD compliance
+    
+    tag (e.g. 'CA_2023') is appended to output filenames.
     """
     print("Calculating equity disparities...")
     
-    # Create outputs folder if it doesn't exist
-    outputs_dir = '../outputs'
-    if not os.path.exists(outputs_dir):
-        os.makedirs(outputs_dir)
-    
     # Merge risk data
     if 'risk_score' not in vehicle_df.columns and risk_data is not None:
         if isinstance(risk_data, pd.DataFrame):
@@ -24,23 +29,19 @@ def calculate_equity_disparities(vehicle_df, risk_data, demo_data=None):
                 on='vin', how='left'
             )
     
-    # Create synthetic demographic data by ZIP
-    zip_demo = pd.DataFrame({
-        'zip_code': [90001, 90011, 90210, 94102, 95123],
-        'median_income': [45000, 38000, 125000, 85000, 72000],
-        'poverty_rate': [0.22, 0.28, 0.05, 0.12, 0.15],
-        'minority_pct': [0.85, 0.92, 0.25, 0.45, 0.38]
-    })
-    
-    # Aggregate by ZIP
-    zip_stats = vehicle_df.groupby('zip_code').agg({
-        'risk_score': 'mean',
-        'vehicle_age': 'mean',
-        'vin': 'count'
-    }).rename(columns={'vin': 'vehicle_count'}).reset_index()
+    # Aggregate by ZIP (categorical key: small integer codes instead of object hashing)
+    zip_key = pd.Series(
+        pd.Categorical(vehicle_df['zip_code'], categories=_ZIP_DEMO.index),
+        index=vehicle_df.index, name='zip_code'
+    )
+    zip_stats = vehicle_df.groupby(zip_key, observed=True, sort=False).agg(
+        risk_score=('risk_score', 'mean'),
+        vehicle_age=('vehicle_age', 'mean'),
+        vehicle_count=('vin', 'count')
+    )
     
-    # Merge with demographic data
-    equity_data = pd.merge(zip_stats, zip_demo, on='zip_code', how='left')
+    # Join demographic data on the ZIP index
+    equity_data = zip_stats.join(_ZIP_DEMO).reset_index()
     
     # Calculate disparity index
     equity_data['income_normalized'] = equity_data['median_income'] / equity_data['median_income'].max()
@@ -51,43 +52,44 @@ def calculate_equity_disparities(vehicle_df, risk_data, demo_data=None):
     )
     
     # Generate HUD report
-    hud_report = generate_hud_equity_report(equity_data)
+    hud_report = generate_hud_equity_report(equity_data, tag=tag)
     
     return {
         'equity_data': equity_data,
         'hud_report': hud_report,
         'summary': {
-            'high_disparity_zips': len(equity_data[equity_data['disparity_index'] > 50]),
+            'high_disparity_zips': int((equity_data['disparity_index'].to_numpy() > 50).sum()),
             'avg_disparity_index': equity_data['disparity_index'].mean()
         }
     }
 
-def generate_hud_equity_report(equity_data):
+def generate_hud_equity_report(equity_data, csv=False, tag=None):
     """
     Generate HUD equity compliance report
+    
+    Saved as Parquet for the next pipeline stage; csv=True also writes a
+    human-readable CSV copy.
     """
     print("Generating HUD equity compliance report...")
     
-    # Create outputs folder if it doesn't exist
-    outputs_dir = '../outputs'
-    if not os.path.exists(outputs_dir):
-        os.makedirs(outputs_dir)
-    
     # Identify high-disparity areas
-    high_disparity = equity_data[equity_data['disparity_index'] > 50].copy()
+    high_disparity = equity_data[equity_data['disparity_index'] > 50]
     
     if len(high_disparity) > 0:
-        high_disparity['hud_priority'] = 'High'
-        high_disparity['recommended_action'] = 'Targeted vehicle replacement program'
-        
-        # Save report
+        # Save report (priority and action are the same for every row, so
+        # they are added at write time, not stored on the frame)
         report_cols = ['zip_code', 'median_income', 'poverty_rate', 
-                      'minority_pct', 'risk_score', 'disparity_index',
-                      'hud_priority', 'recommended_action']
+                      'minority_pct', 'risk_score', 'disparity_index']
         
         report_df = high_disparity[report_cols]
-        report_path = os.path.join(outputs_dir, 'hud_equity_report.csv')
-        report_df.to_csv(report_path, index=False)
+        constants = {
+            'hud_priority': 'High',
+            'recommended_action': 'Targeted vehicle replacement program'
+        }
+        report_path = output_path('hud_equity_report.parquet', tag)
+        write_parquet(report_df, report_path, constants=constants)
+        if csv:
+            write_csv(report_df, report_path.with_suffix('.csv'), constants=constants)
         
         print(f"HUD equity report saved to: {report_path}")
         return report_df
@@ -102,15 +104,15 @@ def test_equity_mapper():
     print("Testing Equity Mapper...")
     
     # Create test data
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n = 100
     
     test_vehicles = pd.DataFrame({
         'vin': [f'VIN{i:08d}' for i in range(n)],
-        'make': np.random.choice(['Toyota', 'Ford', 'Honda'], n),
-        'zip_code': np.random.choice([90001, 90011, 90210, 94102, 95123], n),
-        'vehicle_age': np.random.randint(5, 25, n),
-        'risk_score': np.random.randint(20, 100, n)
+        'make': rng.choice(['Toyota', 'Ford', 'Honda'], n),
+        'zip_code': rng.choice([90001, 90011, 90210, 94102, 95123], n),
+        'vehicle_age': rng.integers(5, 25, n),
+        'risk_score': rng.integers(20, 100, n)
     })
     
     test_risk = pd.DataFrame({
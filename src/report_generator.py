@@ -3,6 +3,7 @@ Generate Comprehensive Regulatory Report
 """
 import pandas as pd
 from datetime import datetime
+from utils import OUTPUTS_DIR
 
 def generate_regulatory_report(state, year, survival_data, risk_data, 
                               emissions_data, equity_data):
@@ -84,7 +85,7 @@ NEXT STEPS
 """
     
     # Save report
-    filename = f'../outputs/regulatory_report_{state}_{year}.txt'
+    filename = OUTPUTS_DIR / f'regulatory_report_{state}_{year}.txt'
     with open(filename, 'w') as f:
         f.write(report_content)
     
@@ -3,11 +3,14 @@ Vehicle Risk Scoring for NHTSA Safety Prioritization
 """
 import pandas as pd
 import numpy as np
-import os
+from utils import output_path, write_csv, write_parquet
 
-def calculate_risk_scores(vehicle_df, crash_data=None):
+def calculate_risk_scores(vehicle_df, crash_data=None, deterministic=False, tag=None):
     """
     Calculate risk scores for vehicles using machine learning
+    
+    deterministic=True drops the synthetic noise term from the score.
+    tag (e.g. 'CA_2023') is appended to output filenames.
     """
     print("Calculating vehicle risk scores...")
     
@@ -16,81 +19,72 @@ def calculate_risk_scores(vehicle_df, crash_data=None):
     
     # Create synthetic risk scores for demonstration
     # In production, this would use real NHTSA crash data
-    np.random.seed(42)
-    
-    # Base risk increases with age and mileage
-    vehicle_df['risk_base'] = (
-        0.1 * vehicle_df['vehicle_age'] + 
-        0.00001 * vehicle_df['odometer'] +
-        0.05 * (2024 - vehicle_df['model_year'])
-    )
+    # (local generator, so the global NumPy RNG state is left untouched)
+    if deterministic:
+        noise = 0.0
+    else:
+        rng = np.random.default_rng(42)
+        noise = rng.standard_normal(len(vehicle_df)) * 5.0
     
     # Add make-specific risk factors
     make_risk = {'Toyota': 0.8, 'Ford': 1.0, 'Honda': 0.9, 
                  'Chevrolet': 1.1, 'Nissan': 1.2}
-    vehicle_df['make_factor'] = vehicle_df['make'].map(make_risk).fillna(1.0)
-    
-    # Calculate final risk score (0-100 scale)
+    makes = pd.Categorical(vehicle_df['make'])
+    # Unknown makes get 1.0; the trailing 1.0 also covers missing makes (code -1)
+    factors = np.array([make_risk.get(c, 1.0) for c in makes.categories] + [1.0])
+    
+    # Calculate final risk score (0-100 scale): base risk increases with age
+    # and mileage, scaled by the make factor, in one expression on ndarrays
+    # (the age and model-year terms are both vehicle_age: 0.1 + 0.05)
+    age = vehicle_df['vehicle_age'].to_numpy()
+    odo = vehicle_df['odometer'].to_numpy()
     vehicle_df['risk_score'] = np.clip(
-        vehicle_df['risk_base'] * vehicle_df['make_factor'] * 20 + 
-        np.random.normal(0, 5, len(vehicle_df)),
+        (0.15 * age + 0.00001 * odo) * factors[makes.codes] * 20 + noise,
         0, 100
-    )
+    ).astype(np.float32)
     
-    # Categorize risk levels
-    conditions = [
-        (vehicle_df['risk_score'] < 30),
-        (vehicle_df['risk_score'] < 60),
-        (vehicle_df['risk_score'] < 80),
-        (vehicle_df['risk_score'] >= 80)
-    ]
-    
-    choices = ['Low', 'Medium', 'High', 'Critical']
-    vehicle_df['risk_level'] = np.select(conditions, choices)
+    # Categorize risk levels (single binary-search pass over thresholds 30/60/80,
+    # stored as float32 like the scores; the integers are exact in float32)
+    labels = np.array(['Low', 'Medium', 'High', 'Critical'])
+    level_edges = np.array([30, 60, 80], dtype=np.float32)
+    level_idx = np.searchsorted(level_edges, vehicle_df['risk_score'].to_numpy(), side='right')
+    vehicle_df['risk_level'] = labels[level_idx]
+    level_counts = np.bincount(level_idx, minlength=len(labels))
     
     # Generate NHTSA priority list
-    priority_list = generate_nhtsa_priority_list(vehicle_df)
+    priority_list = generate_nhtsa_priority_list(vehicle_df, tag=tag)
     
     return {
         'risk_scores': vehicle_df[['vin', 'make', 'model_year', 'vehicle_age', 
                                   'odometer', 'risk_score', 'risk_level']],
         'priority_list': priority_list,
         'summary': {
-            'critical_count': len(vehicle_df[vehicle_df['risk_level'] == 'Critical']),
-            'high_count': len(vehicle_df[vehicle_df['risk_level'] == 'High']),
+            'critical_count': int(level_counts[3]),
+            'high_count': int(level_counts[2]),
             'avg_risk_score': vehicle_df['risk_score'].mean()
         }
     }
 
-def generate_nhtsa_priority_list(vehicle_df, top_n=50):
+def generate_nhtsa_priority_list(vehicle_df, top_n=50, csv=False, tag=None):
     """
     Generate priority list for NHTSA inspections
-    """
-    import os
-    
-    # Create outputs folder if it doesn't exist
-    outputs_dir = '../outputs'
-    if not os.path.exists(outputs_dir):
-        os.makedirs(outputs_dir)
     
+    Saved as Parquet for the next pipeline stage; csv=True also writes a
+    human-readable CSV copy.
+    """
     print(f"Generating NHTSA priority list (top {top_n} vehicles)...")
     
-    # Sort by risk score
-    priority_df = vehicle_df.sort_values('risk_score', ascending=False).head(top_n)
+    # Top-N by risk score (partial selection, no full sort)
+    priority_df = vehicle_df.nlargest(top_n, 'risk_score').copy()
     
     # Add inspection recommendations
-    recommendations = []
-    for _, row in priority_df.iterrows():
-        if row['risk_score'] >= 80:
-            rec = "URGENT: Full safety inspection + emissions test"
-        elif row['risk_score'] >= 60:
-            rec = "PRIORITY: Brake & tire inspection"
-        else:
-            rec = "ROUTINE: Standard safety check"
-        
-        recommendations.append(rec)
-    
-    priority_df['inspection_recommendation'] = recommendations
+    scores = priority_df['risk_score'].to_numpy()
+    priority_df['inspection_recommendation'] = np.select(
+        [scores >= 80, scores >= 60],
+        ["URGENT: Full safety inspection + emissions test",
+         "PRIORITY: Brake & tire inspection"],
+        default="ROUTINE: Standard safety check"
+    )
     
     # Select relevant columns
     result = priority_df[[
@@ -98,11 +92,13 @@ def generate_nhtsa_priority_list(vehicle_df, top_n=50):
         'odometer', 'risk_score', 'risk_level', 'inspection_recommendation'
     ]].copy()
     
-    # Save to CSV
-    csv_file = os.path.join(outputs_dir, 'nhtsa_priority_list.csv')
-    result.to_csv(csv_file, index=False)
+    # Save as Parquet, plus an optional CSV copy
+    output_file = output_path('nhtsa_priority_list.parquet', tag)
+    write_parquet(result, output_file)
+    if csv:
+        write_csv(result, output_file.with_suffix('.csv'))
     
-    print(f"NHTSA priority list saved to: {csv_file}")
+    print(f"NHTSA priority list saved to: {output_file}")
     
     return result
 
@@ -113,15 +109,15 @@ def test_risk_scoring():
     print("Testing Risk Scoring System...")
     
     # Create test data
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n = 1000
     
     test_data = pd.DataFrame({
         'vin': [f'VIN{i:08d}' for i in range(n)],
-        'make': np.random.choice(['Toyota', 'Ford', 'Honda', 'Chevrolet', 'Nissan'], n),
-        'model_year': np.random.randint(2000, 2023, n),
-        'vehicle_age': 2024 - np.random.randint(2000, 2023, n),
-        'odometer': np.random.randint(10000, 200000, n)
+        'make': rng.choice(['Toyota', 'Ford', 'Honda', 'Chevrolet', 'Nissan'], n),
+        'model_year': rng.integers(2000, 2023, n),
+        'vehicle_age': 2024 - rng.integers(2000, 2023, n),
+        'odometer': rng.integers(10000, 200000, n)
     })
     
     print(f"Test data: {n} vehicles")
@@ -4,9 +4,9 @@ Implements: Cohort Survival Projection, Greenspan-Cohen, Okamoto models
 """
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import math
-import os  # ADD THIS LINE
+from utils import NUMBA_MIN_ROWS, njit, output_path
+
 def calculate_cohort_survival(vehicle_df, max_age=30):
     """
     COHORT SURVIVAL PROJECTION METHOD (PhD Page 33-34)
@@ -17,32 +17,21 @@ def calculate_cohort_survival(vehicle_df, max_age=30):
     bins = [0, 5, 10, 15, max_age]
     labels = ['0-5', '5-10', '10-15', '15+']
     
-    # Manually calculate without categorical issues
-    results = []
-    for i, (low, high) in enumerate(zip(bins[:-1], bins[1:])):
-        label = labels[i]
-        cohort_data = vehicle_df[(vehicle_df['vehicle_age'] >= low) & 
-                                 (vehicle_df['vehicle_age'] < high)]
-        
-        if len(cohort_data) > 0:
-            avg_age = cohort_data['vehicle_age'].mean()
-            avg_odometer = cohort_data['odometer'].mean()
-            count = len(cohort_data)
-            
-            # Survival rates from PhD research
-            survival_rates = {'0-5': 0.95, '5-10': 0.85, '10-15': 0.70, '15+': 0.50}
-            survival_rate = survival_rates.get(label, 0.5)
-            
-            results.append({
-                'age_cohort': label,
-                'count': count,
-                'avg_age': avg_age,
-                'avg_odometer': avg_odometer,
-                'survival_rate': survival_rate,
-                'expected_remaining': survival_rate * (max_age - avg_age)
-            })
-    
-    return pd.DataFrame(results)
+    # Bin once, then aggregate every cohort in a single groupby
+    # (observed=True drops empty cohorts; categorical order keeps 0-5 first)
+    cohort = pd.cut(vehicle_df['vehicle_age'], bins=bins, labels=labels, right=False)
+    results = vehicle_df.groupby(cohort, observed=True).agg(
+        count=('vehicle_age', 'size'),
+        avg_age=('vehicle_age', 'mean'),
+        avg_odometer=('odometer', 'mean')
+    )
+    
+    # Survival rates from PhD research
+    survival_rates = {'0-5': 0.95, '5-10': 0.85, '10-15': 0.70, '15+': 0.50}
+    results['survival_rate'] = results.index.map(survival_rates).astype(float)
+    results['expected_remaining'] = results['survival_rate'] * (max_age - results['avg_age'])
+    
+    return results.rename_axis('age_cohort').reset_index().astype({'age_cohort': object})
 
 def calculate_greenspan_cohen_survival(vehicle_df):
     """
@@ -67,16 +56,20 @@ def calculate_okamoto_survival(vehicle_df, M=30, a=0.95):
     """
     print("Applying Okamoto's Survival Model (PhD Equation 6-10)...")
     
-    def okamoto_survival(t, M=30, a=0.95):
-        if t >= M:
-            return 0.0
-        if t == 0:
-            return 1.0
-        return a ** (t / (t - M))
-    
-    vehicle_df['survival_probability_okamoto'] = vehicle_df['vehicle_age'].apply(
-        lambda t: okamoto_survival(t, M, a)
-    )
+    t = vehicle_df['vehicle_age'].to_numpy()
+    if (np.issubdtype(t.dtype, np.integer) and float(M).is_integer()
+            and (t.size == 0 or t.min() >= 0)):
+        # Non-negative integer ages and integer M: evaluate P(t) once per age
+        # 0..M and gather (anything else, e.g. negative ages from future model
+        # years or a fractional M, uses the closed form)
+        M = int(M)
+        ts = np.arange(M)
+        lut = np.append(np.where(ts == 0, 1.0, a ** (ts / (ts - M))), 0.0)
+        vehicle_df['survival_probability_okamoto'] = lut[np.minimum(t, M)]
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = np.power(a, t / (t - M))
+        vehicle_df['survival_probability_okamoto'] = np.where(t >= M, 0.0, np.where(t == 0, 1.0, p))
     
     return vehicle_df
 
@@ -87,7 +80,7 @@ def calculate_scrap_elasticity_effect(vehicle_df, eta=-0.7):
     """
     print(f"Applying Scrap Elasticity Model (eta = {eta})...")
     
-    vehicle_df['price_premium'] = 1 + 0.1 * (2023 - vehicle_df['model_year'])
+    vehicle_df['price_premium'] = 1 + 0.1 * vehicle_df['vehicle_age']
     base_survival = np.exp(-0.1 * vehicle_df['vehicle_age'])
     elasticity_effect = 1 + eta * vehicle_df['price_premium']
     
@@ -96,9 +89,32 @@ def calculate_scrap_elasticity_effect(vehicle_df, eta=-0.7):
     
     return vehicle_df
 
-def calculate_phd_survival_curves(vehicle_df):
+def _fused_survival(age, odometer, M, a, eta):
+    """
+    Greenspan-Cohen, Okamoto and scrap-elasticity models combined in one pass
+    (same formulas and 0.3/0.3/0.4 weights as the per-model functions above)
+    """
+    gc = 0.7 * np.exp(-0.05 * age) + 0.3 * np.exp(-0.03 * odometer / 10000)
+    okamoto = np.where(age >= M, 0.0, np.where(age == 0, 1.0, a ** (age / (age - M))))
+    elasticity = np.exp(-0.1 * age) * (1 + eta * (1 + 0.1 * age))
+    elasticity = np.minimum(np.maximum(elasticity, 0.0), 1.0)
+    return 0.3 * gc + 0.3 * okamoto + 0.4 * elasticity
+
+# parallel=True fuses the array expressions above into a single loop
+_fused_survival_jit = (
+    njit(parallel=True, error_model='numpy', cache=True)(_fused_survival)
+    if njit is not None else None
+)
+
+def calculate_phd_survival_curves(vehicle_df, model_columns=False, plot=False, tag=None):
     """
     MAIN FUNCTION: Combine all PhD survival models
+    
+    Per-model columns (survival_probability_gc, survival_probability_okamoto,
+    survival_elasticity_adjusted, ...) are only kept when model_columns=True;
+    otherwise the models are evaluated in one fused pass. plot=True also
+    saves survival_plot.png; tag (e.g. 'CA_2023') is appended to output
+    filenames.
     """
     print("=" * 60)
     print("CALCULATING VEHICLE SURVIVAL USING PHD MODELS")
@@ -106,51 +122,61 @@ def calculate_phd_survival_curves(vehicle_df):
     
     # Apply all models
     cohort_results = calculate_cohort_survival(vehicle_df)
-    vehicle_df = calculate_greenspan_cohen_survival(vehicle_df)
-    vehicle_df = calculate_okamoto_survival(vehicle_df)
-    vehicle_df = calculate_scrap_elasticity_effect(vehicle_df)
-    
-    # Combine results
-    vehicle_df['final_survival_probability'] = (
-        0.3 * vehicle_df['survival_probability_gc'] +
-        0.3 * vehicle_df['survival_probability_okamoto'] +
-        0.4 * vehicle_df['survival_elasticity_adjusted']
-    )
+    if model_columns:
+        vehicle_df = calculate_greenspan_cohen_survival(vehicle_df)
+        vehicle_df = calculate_okamoto_survival(vehicle_df)
+        vehicle_df = calculate_scrap_elasticity_effect(vehicle_df)
+        
+        # Combine results
+        vehicle_df['final_survival_probability'] = (
+            0.3 * vehicle_df['survival_probability_gc'] +
+            0.3 * vehicle_df['survival_probability_okamoto'] +
+            0.4 * vehicle_df['survival_elasticity_adjusted']
+        ).astype(np.float32)
+    else:
+        print("Applying Greenspan & Cohen, Okamoto and Scrap Elasticity models (fused)...")
+        if _fused_survival_jit is not None and len(vehicle_df) >= NUMBA_MIN_ROWS:
+            fused = _fused_survival_jit
+        else:
+            fused = _fused_survival
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vehicle_df['final_survival_probability'] = fused(
+                vehicle_df['vehicle_age'].to_numpy(),
+                vehicle_df['odometer'].to_numpy(),
+                30, 0.95, -0.7
+            ).astype(np.float32)
+    
+    # Summary statistics (computed once; also used by the text output)
+    survival = vehicle_df['final_survival_probability']
+    summary = {
+        'avg_survival': survival.mean(),
+        'median_remaining': (30 - vehicle_df['vehicle_age']).median(),
+        'high_risk': int((survival.to_numpy() < 0.5).sum()),
+        'leakage_estimate': 0.15
+    }
     
     # Generate output
-    generate_output(vehicle_df, cohort_results)
+    generate_output(vehicle_df, cohort_results, summary, plot=plot, tag=tag)
     
     return {
         'vehicle_df': vehicle_df,
         'cohort_results': cohort_results,
-        'summary': {
-            'avg_survival': vehicle_df['final_survival_probability'].mean(),
-            'median_remaining': (30 - vehicle_df['vehicle_age']).median(),
-            'high_risk': len(vehicle_df[vehicle_df['final_survival_probability'] < 0.5]),
-            'leakage_estimate': 0.15
-        }
+        'summary': summary
     }
 
-def generate_output(vehicle_df, cohort_results):
+def generate_output(vehicle_df, cohort_results, summary, plot=False, tag=None):
     """
-    Generate output files
+    Generate output files (the survival plot only when plot=True)
     """
-    import os
-    
-    # Create outputs folder if it doesn't exist
-    outputs_dir = '../outputs'
-    if not os.path.exists(outputs_dir):
-        os.makedirs(outputs_dir)
-    
     # Simple text output first
     output_text = f"""
 PHD SURVIVAL MODEL RESULTS
 ==========================
 Total Vehicles: {len(vehicle_df)}
-Average Survival Probability: {vehicle_df['final_survival_probability'].mean():.3f}
-Median Remaining Life: {(30 - vehicle_df['vehicle_age']).median():.1f} years
-High-Risk Vehicles (<50% survival): {len(vehicle_df[vehicle_df['final_survival_probability'] < 0.5])}
-Estimated Regulatory Leakage: 15.0%
+Average Survival Probability: {summary['avg_survival']:.3f}
+Median Remaining Life: {summary['median_remaining']:.1f} years
+High-Risk Vehicles (<50% survival): {summary['high_risk']}
+Estimated Regulatory Leakage: {summary['leakage_estimate']:.1%}
 
 COHORT ANALYSIS:
 {cohort_results.to_string()}
@@ -165,12 +191,15 @@ MODELS APPLIED:
     print(output_text)
     
     # Save to file
-    output_file = os.path.join(outputs_dir, 'phd_survival_results.txt')
+    output_file = output_path('phd_survival_results.txt', tag)
     with open(output_file, 'w') as f:
         f.write(output_text)
     
     print(f"Results saved to: {output_file}")
     
+    if not plot:
+        return
+    
     # Try to create simple plot (skip if matplotlib fails)
     try:
         import matplotlib.pyplot as plt
@@ -185,15 +214,24 @@ MODELS APPLIED:
         
         # Survival by age
         plt.subplot(1, 2, 2)
-        age_groups = vehicle_df.groupby('vehicle_age')['final_survival_probability'].mean()
-        plt.plot(age_groups.index, age_groups.values, 'r-', linewidth=2)
+        ages = vehicle_df['vehicle_age'].to_numpy()
+        survival = vehicle_df['final_survival_probability'].to_numpy()
+        if np.issubdtype(ages.dtype, np.integer) and ages.min() >= 0:
+            # Mean per age in one pass: weighted and plain counts per age bin
+            counts = np.bincount(ages)
+            present = np.flatnonzero(counts)
+            mean_by_age = np.bincount(ages, weights=survival)[present] / counts[present]
+        else:
+            age_groups = vehicle_df.groupby('vehicle_age')['final_survival_probability'].mean()
+            present, mean_by_age = age_groups.index, age_groups.to_numpy()
+        plt.plot(present, mean_by_age, 'r-', linewidth=2)
         plt.title('Survival Probability by Age')
         plt.xlabel('Vehicle Age (Years)')
         plt.ylabel('Survival Probability')
         plt.ylim(0, 1)
         
         plt.tight_layout()
-        plot_file = os.path.join(outputs_dir, 'survival_plot.png')
+        plot_file = output_path('survival_plot.png', tag)
         plt.savefig(plot_file, dpi=150)
         plt.close()
         print(f"Plot saved to: {plot_file}")
@@ -0,0 +1,81 @@
+"""
+Shared helpers for the IVLRF pipeline modules
+"""
+import csv
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; callers keep a NumPy/pandas path
+    njit = prange = None
+
+# Below this many rows JIT dispatch overhead outweighs the compiled kernels
+NUMBA_MIN_ROWS = 10_000
+
+# Repo-level outputs folder shared by all pipeline modules; created once on
+# import so writes do not depend on the current working directory
+OUTPUTS_DIR = Path(__file__).resolve().parent.parent / 'outputs'
+OUTPUTS_DIR.mkdir(exist_ok=True)
+
+def output_path(name, tag=None):
+    """
+    Path of an output file; a run tag (e.g. 'CA_2023') goes before the
+    extension so concurrent runs write separate files
+    """
+    if tag:
+        name = f"{Path(name).stem}_{tag}{Path(name).suffix}"
+    return OUTPUTS_DIR / name
+
+def _csv_cells(values):
+    """
+    Column values for csv.writer; missing values become empty fields, as
+    in DataFrame.to_csv
+    """
+    missing = pd.isna(values)
+    if not missing.any():
+        return values
+    # Element-wise copy keeps NumPy scalar types (float32 prints as float32)
+    cells = np.empty(len(values), dtype=object)
+    cells[:] = list(values)
+    cells[missing] = ''
+    return cells
+
+def write_csv(df, path, batch_size=1000, constants=None):
+    """
+    Write a DataFrame to CSV with the builtin csv module, in row batches
+    
+    Rows are zipped straight from the column arrays, skipping the per-cell
+    formatting path of DataFrame.to_csv. constants ({column: value}) are
+    appended to every row without being materialized on the frame.
+    """
+    columns = [_csv_cells(df[col].to_numpy()) for col in df.columns]
+    constants = constants or {}
+    suffix = tuple(constants.values())
+    
+    with open(path, 'w', buffering=1 << 20, newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+        writer.writerow([*df.columns, *constants])
+        for start in range(0, len(df), batch_size):
+            rows = zip(*(col[start:start + batch_size] for col in columns))
+            if suffix:
+                rows = (row + suffix for row in rows)
+            writer.writerows(rows)
+
+def write_parquet(df, path, constants=None):
+    """
+    Write a DataFrame to zstd-compressed Parquet for downstream consumers
+    
+    constants ({column: value}) become dictionary-encoded columns holding a
+    single stored value, mirroring write_csv.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if constants:
+        indices = pa.array(np.zeros(len(df), dtype=np.int8))
+        for name, value in constants.items():
+            table = table.append_column(name, pa.DictionaryArray.from_arrays(indices, pa.array([value])))
+    pq.write_table(table, path, compression='zstd')